@@ -122,6 +122,9 @@ branch of mathematics.
     prime_sum:
         Return the sum of primes less than n.
 
+    prime_stats:
+        Return the count and sum of the primes up to n, in one pass.
+
     prime_partial_sums:
         Yield the running sums of primes less than n.
 
@@ -171,6 +174,7 @@ without notice.
 
 from __future__ import division
 
+import bisect
 import itertools
 import warnings
 
@@ -178,6 +182,12 @@ import pyprimes.strategic
 from pyprimes.compat23 import next
 from pyprimes.utilities import filter_between
 
+try:
+    from math import gcd
+except ImportError:
+    # No math.gcd before Python 3.5.
+    from fractions import gcd
+
 
 # Module metadata.
 __version__ = "0.2.2a"
@@ -188,7 +198,7 @@ __author_email__ = "steve+python@pearwood.info"
 
 __all__ = ['is_prime', 'MaybeComposite', 'next_prime', 'nprimes',
            'nth_prime', 'prev_prime', 'prime_count', 'prime_partial_sums',
-           'prime_sum', 'primes', 'trial_division',
+           'prime_stats', 'prime_sum', 'primes', 'trial_division',
           ]
 
 
@@ -199,6 +209,20 @@ class MaybeComposite(RuntimeWarning):
 
 # === Generate prime numbers ===
 
+# Lazily resolved default strategy and prover. The imports cannot happen
+# at the top of the module (the sub-modules import this package), so
+# they are resolved on first use and cached here, rather than re-running
+# the ``from ... import`` machinery on every call.
+_default_strategy = None
+_default_prover = None
+
+# When ``start`` is at least this large, primes() sieves segments
+# beginning directly at start rather than winding the default generator
+# through every smaller prime first. Below it, the generator reaches
+# start quickly enough that the segmented set-up isn't worth it.
+_SEGMENT_THRESHOLD = 10**6
+
+
 def primes(start=None, end=None):
     """Yield primes, optionally between ``start`` and ``end``.
 
@@ -219,8 +243,16 @@ def primes(start=None, end=None):
     first prime yielded will be 2. If ``end`` is not given or is None,
     there is no upper limit.
     """
-    from pyprimes.sieves import best_sieve
-    return pyprimes.strategic.primes(best_sieve, start, end)
+    if start is not None and start >= _SEGMENT_THRESHOLD:
+        # Skip the wind-up phase: sieve segments beginning at start
+        # instead of discarding every prime below it one by one.
+        from pyprimes.sieves import primes_from
+        return filter_between(primes_from(start), None, end)
+    global _default_strategy
+    if _default_strategy is None:
+        from pyprimes.sieves import best_sieve
+        _default_strategy = best_sieve
+    return pyprimes.strategic.primes(_default_strategy, start, end)
 
 
 def next_prime(n):
@@ -229,7 +261,7 @@ def next_prime(n):
     >>> next_prime(97)
     101
 
-    For sufficiently large n, over approximately 341 trillion, the result
+    For sufficiently large n, over approximately 3.3e24, the result
     may be only probably prime rather than certainly prime.
     """
     return pyprimes.strategic.next_prime(is_prime, n)
@@ -243,7 +275,7 @@ def prev_prime(n):
 
     If there are no primes less than n, raises ValueError.
 
-    For sufficiently large n, over approximately 341 trillion, the result
+    For sufficiently large n, over approximately 3.3e24, the result
     may be only probably prime rather than certainly prime.
     """
     return pyprimes.strategic.prev_prime(is_prime, n)
@@ -251,6 +283,48 @@ def prev_prime(n):
 
 # === Primality testing ===
 
+def _prover_flag(n):
+    """Return the raw 0/1/2 primality flag for n from the default
+    prover. Memoized below where functools.lru_cache is available."""
+    global _default_prover
+    if _default_prover is None:
+        from pyprimes.probabilistic import is_probable_prime
+        _default_prover = is_probable_prime
+    return pyprimes.strategic.is_prime(_default_prover, n)
+
+try:
+    import functools
+    # Bound the cache; repeated queries of the same values (common in
+    # factorising loops and prime walks) become dict hits.
+    _prover_flag = functools.lru_cache(maxsize=1<<16)(_prover_flag)
+except (ImportError, AttributeError):
+    # No lru_cache before Python 3.2; just skip the memoization.
+    pass
+
+
+# Flat table of primality flags for n below 2**16, one byte per value,
+# built lazily on the first small-n call to is_prime. Indexing it is a
+# single C-level fetch, far cheaper than even setting up Miller-Rabin,
+# and small arguments dominate many workloads (including next_prime and
+# prev_prime walks near the bottom of the number line). At 64 KiB the
+# byte-per-value layout stays permanently cache-resident; packing the
+# flags eight to a byte would save memory but cost a shift and mask per
+# lookup (the same trade-off documented in sieves.erat).
+_SMALL_LIMIT = 1 << 16
+_small_prime_flags = None
+
+
+def _build_small_flags():
+    """Build, cache and return the small-n primality table."""
+    global _small_prime_flags
+    from pyprimes.sieves import erat
+    flags = bytearray(_SMALL_LIMIT)
+    for p in erat(_SMALL_LIMIT - 1):
+        flags[p] = 1
+    _small_prime_flags = flags
+    return flags
+
+
 def is_prime(n):
     """Return True if n is probably a prime number, and False if it is not.
 
@@ -269,16 +343,29 @@ def is_prime(n):
 
     If ``is_prime`` returns False, the number is certainly composite.
     """
-    from pyprimes.probabilistic import is_probable_prime
-    flag = pyprimes.strategic.is_prime(is_probable_prime, n)
+    if 0 <= n < _SMALL_LIMIT:
+        flags = _small_prime_flags
+        if flags is None:
+            flags = _build_small_flags()
+        return bool(flags[n])
+    flag = _prover_flag(n)
     assert flag in (0, 1, 2)
     if flag == 2:
-        message = "%d is only only probably prime" % n
-        import warnings
+        message = "%d is only probably prime" % n
         warnings.warn(message, MaybeComposite)
     return bool(flag)
 
 
+# The primes up to 47, and their product, which fits in 64 bits. A
+# single gcd against the product detects a factor among all fifteen
+# primes at once; trial_division uses it below to replace the first
+# fifteen trial divisions with one C-level gcd.
+_GCD_PRIMES = frozenset(
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47])
+_GCD_PRIME_PROD = 614889782588491410
+assert _GCD_PRIME_PROD < 2**64
+
+
 def trial_division(n):
     """trial_division(n) -> True|False
 
@@ -292,11 +379,101 @@ def trial_division(n):
 
     For large values of n, this may be slow or run out of memory.
     """
+    if n >= 9:
+        from pyprimes.utilities import isqrt
+        import math
+        limit = isqrt(n)
+        # Trial-divide against the shared prime cache, a dense list,
+        # instead of resuming a generator pipeline per divisor -- but
+        # only if the primes up to sqrt(n) fit under the cache cap.
+        if 1.3*limit/math.log(limit) <= _MAX_CACHED_PRIMES:
+            if not (n & 1):
+                return False
+            if gcd(n, _GCD_PRIME_PROD) != 1:
+                # n shares a factor with the product of the primes up
+                # to 47, so it is composite unless it is itself one of
+                # those primes.
+                return n in _GCD_PRIMES
+            if limit <= 47:
+                # No prime factor up to 47, and sqrt(n) <= 47, so n
+                # must be prime.
+                return True
+            _cache.ensure_value(limit+1)
+            # The gcd above has already ruled out the first fifteen
+            # primes, so start the trial divisions from 53.
+            for p in itertools.islice(_cache.primes, 15, None):
+                if p > limit:
+                    return True
+                if n % p == 0:
+                    return False
+            return True
     return pyprimes.strategic.trial_division(primes, n)
 
 
 # === Number theory convenience functions ===
 
+class _PrimeCache(object):
+    """Shared, monotonically growing cache of the prime sequence.
+
+    The cache is grown on demand from the preferred sieve and shared
+    by the convenience functions below, so that repeated calls do not
+    re-sieve the same prefix of the primes over and over again.
+    """
+    def __init__(self):
+        self.primes = []
+        # sums[i] is the sum of the first i cached primes, so sums is
+        # always exactly one item longer than primes.
+        self.sums = [0]
+        self._source = None
+
+    def _extend(self, done):
+        """Cache primes until done(list of primes) becomes true."""
+        if self._source is None:
+            from pyprimes.sieves import best_sieve
+            self._source = best_sieve()
+        primes, sums, source = self.primes, self.sums, self._source
+        append = primes.append
+        append_sum = sums.append
+        while not done(primes):
+            p = next(source)
+            append(p)
+            append_sum(sums[-1] + p)
+
+    def ensure_count(self, n):
+        """Ensure at least n primes are cached."""
+        if len(self.primes) < n:
+            self._extend(lambda ps: len(ps) >= n)
+
+    def ensure_value(self, x):
+        """Ensure every prime less than x is cached (the last cached
+        prime will be the first one greater than or equal to x)."""
+        if not self.primes or self.primes[-1] < x:
+            self._extend(lambda ps: ps and ps[-1] >= x)
+
+
+_cache = _PrimeCache()
+
+# Don't let the convenience functions grow the shared cache beyond
+# roughly this many primes (a few tens of megabytes); larger requests
+# fall back to streaming from a fresh generator instead.
+_MAX_CACHED_PRIMES = 10**6
+
+
+def _rosser_bound(n):
+    """Return a strict upper bound on the nth prime, for n >= 6.
+
+    By Rosser's theorem, the nth prime is less than n*(ln n + ln ln n).
+    """
+    import math
+    return int(n*(math.log(n) + math.log(math.log(n)))) + 1
+
+
+# Upper limit on the size of a throw-away sieve built to answer a
+# single request that is too big for the shared cache; beyond this the
+# convenience functions stream from a generator in constant memory.
+_MAX_SIEVE_BOUND = 10**8
+
+
 def nprimes(n):
     """Convenience function that yields the first n primes only.
 
@@ -304,6 +481,22 @@ def nprimes(n):
     [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
 
     """
+    if 0 <= n <= _MAX_CACHED_PRIMES:
+        _cache.ensure_count(n)
+        return iter(_cache.primes[:n])
+    if n > _MAX_CACHED_PRIMES:
+        # Too big for the cache, but a single sieve up to Rosser's
+        # bound on the nth prime still beats resuming a generator n
+        # times, provided the sieve stays a reasonable size.
+        bound = _rosser_bound(n)
+        if bound <= _MAX_SIEVE_BOUND:
+            from pyprimes.sieves import erat
+            ps = erat(bound)
+            assert len(ps) >= n
+            del ps[n:]
+            return iter(ps)
+    # Huge n, and negative values (which islice rejects with
+    # ValueError), fall back to the streaming path.
     return itertools.islice(primes(), n)
 
 
@@ -324,6 +517,16 @@ def nth_prime(n):
     # http://oeis.org/A000040
     if n < 1:
         raise ValueError('argument must be a positive integer')
+    if n <= _MAX_CACHED_PRIMES:
+        _cache.ensure_count(n)
+        return _cache.primes[n-1]
+    # As in nprimes: one sieve up to Rosser's bound, then index it.
+    bound = _rosser_bound(n)
+    if bound <= _MAX_SIEVE_BOUND:
+        from pyprimes.sieves import erat
+        ps = erat(bound)
+        assert len(ps) >= n
+        return ps[n-1]
     return next(itertools.islice(primes(), n-1, n))
 
 
@@ -347,7 +550,78 @@ def prime_count(n):
     # See also:  http://primes.utm.edu/howmany.shtml
     # http://mathworld.wolfram.com/PrimeCountingFunction.html
     # http://oeis.org/A000720
-    return sum(1 for p in primes(end=n+1))
+    if n < 2:
+        return 0
+    # An over-estimate of pi(n), used only to decide whether the cache
+    # would grow too large: pi(n) < 1.3*n/ln(n) for n >= 17.
+    import math
+    estimate = 1.3*n/math.log(n)
+    if estimate <= _MAX_CACHED_PRIMES:
+        _cache.ensure_value(n+1)
+        return bisect.bisect_right(_cache.primes, n)
+    # For larger n, count with Legendre's formula, which only needs the
+    # primes up to sqrt(n) rather than enumerating every prime up to n.
+    return _legendre_count(n)
+
+
+def _phi(x, a, primes, memo):
+    """Return the count of integers in 1...x (inclusive) which are not
+    divisible by any of the first ``a`` primes.
+
+    ``primes`` must contain at least the first ``a`` primes, and ``memo``
+    is a dict used to memoise repeated subproblems.
+
+    Private function used by _legendre_count.
+    """
+    if a == 0 or x == 0:
+        return x
+    key = (x, a)
+    try:
+        return memo[key]
+    except KeyError:
+        pass
+    # Unroll the recursion phi(x, a) = phi(x, a-1) - phi(x//p_a, a-1)
+    # in its first term, giving phi(x, a) = x - sum of phi(x//p_i, i-1)
+    # for i = 1...a. Only the second term recurses, and it divides x by
+    # at least 2, so the recursion depth is bounded by log2(x) rather
+    # than by a.
+    total = x
+    for i in range(1, a+1):
+        q = x // primes[i-1]
+        if q == 0:
+            # This and all remaining primes exceed x, contributing
+            # nothing to the sum.
+            break
+        total -= _phi(q, i-1, primes, memo)
+    memo[key] = total
+    return total
+
+
+def _legendre_count(n):
+    """Return the number of primes <= n using Legendre's formula.
+
+    This needs only the primes up to sqrt(n), so for large n it uses far
+    less time and memory than sieving and counting every prime up to n.
+
+    Private function used by prime_count.
+    """
+    # pi(n) = phi(n, a) + a - 1, where a = pi(sqrt(n)). See:
+    # http://mathworld.wolfram.com/LegendresFormula.html
+    from pyprimes.utilities import isqrt
+    import math
+    root = isqrt(n)
+    if root >= 17 and 1.3*root/math.log(root) > _MAX_CACHED_PRIMES:
+        # The primes up to sqrt(n) would blow past the shared cache's
+        # cap, so build them locally instead of committing them to the
+        # cache (as nprimes and prime_sum do for oversized requests).
+        from pyprimes.sieves import erat
+        base_primes = erat(root)
+        a = len(base_primes)
+    else:
+        _cache.ensure_value(root+1)
+        base_primes = _cache.primes
+        a = bisect.bisect_right(base_primes, root)
+    return _phi(n, a, base_primes, {}) + a - 1
 
 
 def prime_sum(n):
@@ -366,9 +640,74 @@ def prime_sum(n):
     # http://oeis.org/A007504
     if n < 1:
         return 0
+    if n <= _MAX_CACHED_PRIMES:
+        # The cache keeps running sums alongside the primes, so this is
+        # just an index instead of an O(n) summation.
+        _cache.ensure_count(n)
+        return _cache.sums[n]
+    # Too big for the cache: sieve up to Rosser's bound on the nth
+    # prime with the C-speed array sieve and sum the first n primes,
+    # provided the bound keeps the sieve to a reasonable size.
+    bound = _rosser_bound(n)
+    if bound <= _MAX_SIEVE_BOUND:
+        from pyprimes.sieves import erat
+        ps = erat(bound)
+        assert len(ps) >= n
+        return sum(ps[:n])
+    # Otherwise fall back on streaming the primes with constant memory.
     return sum(nprimes(n))
 
 
+def prime_stats(n):
+    """prime_stats(n) -> (count, total)
+
+    Return the number of primes less than or equal to n together with
+    their sum, computed in a single pass over the primes.
+
+    >>> prime_stats(20)
+    (8, 77)
+    >>> prime_stats(1)
+    (0, 0)
+
+    The count is the same value returned by ``prime_count(n)``. Note
+    that ``prime_sum`` measures something different: it sums the first
+    n primes, not the primes up to n.
+    """
+    if n < 2:
+        return (0, 0)
+    import math
+    estimate = 1.3*n/math.log(n)
+    if estimate <= _MAX_CACHED_PRIMES:
+        # The cache keeps running sums alongside the primes, so both
+        # answers are a bisect and an index away.
+        _cache.ensure_value(n+1)
+        i = bisect.bisect_right(_cache.primes, n)
+        return (i, _cache.sums[i])
+    if n <= _MAX_SIEVE_BOUND:
+        # One throw-away sieve, counted and summed at C speed.
+        from pyprimes.sieves import erat
+        ps = erat(n)
+        return (len(ps), sum(ps))
+    # Otherwise stream the primes once, accumulating both answers.
+    count = total = 0
+    for p in primes():
+        if p > n:
+            break
+        count += 1
+        total += p
+    return (count, total)
+
+
+# itertools.accumulate with the initial argument needs Python 3.8;
+# probe for it once, rather than on every prime_partial_sums call.
+try:
+    itertools.accumulate((), initial=0)
+except (AttributeError, TypeError):
+    _HAVE_ACCUMULATE_INITIAL = False
+else:
+    _HAVE_ACCUMULATE_INITIAL = True
+
+
 def prime_partial_sums():
     """Yield the partial sums of the prime numbers.
 
@@ -378,6 +717,14 @@ def prime_partial_sums():
 
     """
     # http://oeis.org/A007504
+    if _HAVE_ACCUMULATE_INITIAL:
+        # accumulate performs the running additions in C.
+        return itertools.accumulate(primes(), initial=0)
+    return _prime_partial_sums()
+
+
+def _prime_partial_sums():
+    """Pure Python fallback for prime_partial_sums."""
     n = 0
     for p in primes():
         yield n
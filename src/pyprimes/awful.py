@@ -52,10 +52,9 @@ def isprime(n):
         return True
     if n < 2 or n % 2 == 0:
         return False
-    for i in range(3, isqrt(n)+1, 2):
-        if n % i == 0:
-            return False
-    return True
+    # any() short-circuits at the first factor found, just like the
+    # explicit loop did, but dispatches the loop itself in C.
+    return not any(n % i == 0 for i in range(3, isqrt(n)+1, 2))
 
 
 def isprime_regex(n):
@@ -73,7 +72,13 @@ def isprime_regex(n):
     # For a Perl or Ruby version of this, see here:
     # http://montreal.pm.org/tech/neil_kandalgaonkar.shtml
     # http://www.noulakaz.net/weblog/2007/03/18/a-regular-expression-to-check-for-prime-numbers/
-    return not re.match(r'^1?$|^(11+?)\1+$', '1'*n)
+    return not _PRIME_REGEX.match('1'*n)
+
+
+# Compiled once at import time, so each call to isprime_regex skips the
+# re module's pattern-cache lookup. The matching itself is every bit as
+# awful as before.
+_PRIME_REGEX = re.compile(r'^1?$|^(11+?)\1+$')
 
 
 # === Generating prime numbers by trial division ===
@@ -241,3 +246,27 @@ def turner():
         nums = filter(lambda v, p=prime: (v % p) != 0, nums)
 
 
+def turner_flat():
+    """Generate prime numbers very slowly using Euler's sieve, without
+    stacking filters.
+
+    >>> p = turner_flat()
+    >>> [next(p) for _ in range(10)]
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+
+    This performs exactly the same divisibility tests as ``turner``,
+    but stores the primes seen so far in a single list instead of
+    wrapping the candidate stream in one nested ``filter`` per prime.
+    The asymptotic behaviour is identical -- every candidate is still
+    divided by every smaller prime, O(N**2/(log N)**2) overall -- but
+    each candidate costs one Python loop rather than a whole stack of
+    generator frames, so there is less constant overhead (and no risk
+    of hitting the recursion limit tearing down the filters).
+    """
+    seen = []
+    for i in itertools.count(2):
+        if all(i % p for p in seen):
+            seen.append(i)
+            yield i
+
+
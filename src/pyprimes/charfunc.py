@@ -15,6 +15,55 @@ use ``enumerate()`` or zip the results against a range of integers:
 
 """
 
+import itertools
+
+import pyprimes
+import pyprimes.strategic
+
+
+# Ranges wider than this are streamed rather than materialised as one
+# flat bytearray by characteristic().
+_MAX_BYTES = 10**8
+
+
+def characteristic_bytes(start=0, end=None):
+    """Return the characteristic function of the primes over the range
+    ``start`` (inclusive) to ``end`` (exclusive), packed as a bytearray.
+
+    Entry i of the result is 1 if ``start + i`` is prime, otherwise 0:
+
+    >>> characteristic_bytes(0, 10) == bytearray(
+    ...     [0, 0, 1, 1, 0, 1, 0, 1, 0, 0])
+    True
+    >>> characteristic_bytes(28, 32) == bytearray([0, 1, 0, 1])
+    True
+
+    Unlike ``characteristic``, the whole range is computed up front with
+    a sieve and the result is a flat byte per integer, which is far
+    cheaper than one Python object per integer when processing the range
+    in bulk. Only the requested window is sieved, so the cost is
+    O(width + sqrt(end)) regardless of how large ``start`` is. ``end``
+    is mandatory.
+    """
+    if start is None:
+        start = 0
+    if end is None:
+        raise TypeError('end argument is required')
+    width = max(0, end - start)
+    flags = bytearray(width)
+    if width:
+        # Sieve just the window against the primes up to sqrt(end),
+        # rather than sieving the whole range from zero; this keeps
+        # narrow windows at large start cheap.
+        lo = max(start, 2)
+        if lo < end:
+            from pyprimes.sieves import erat, _sieve_segment
+            from pyprimes.utilities import isqrt
+            base_primes = erat(isqrt(end - 1))
+            for p in _sieve_segment((lo, end, base_primes)):
+                flags[p - start] = 1
+    return flags
+
 
 def characteristic(start=0, end=None, strategy=None):
     """Yield is_prime(n) for all integers between ``start`` and ``end``.
@@ -27,20 +76,20 @@ def characteristic(start=0, end=None, strategy=None):
     for n > 0, except this yields True for primes and False for non-primes
     rather than 1 and 0, and by default it begins with n=0:
 
-    #>>> it = characteristic()
-    #>>> [next(it) for _ in range(6)]
+    >>> it = characteristic()
+    >>> [next(it) for _ in range(6)]
     [False, False, True, True, False, True]
 
     To use 1 and 0 instead, call ``int()`` on the results:
 
-    #>>> [int(next(it)) for _ in range(20)]
+    >>> [int(next(it)) for _ in range(20)]
     [0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0]
 
     Optional arguments ``start`` and ``end`` specify the first (included)
     and last (excluded) value. ``start`` defaults to 0, and ``end`` defaults
     to None (no upper limit, yield values forever).
 
-    #>>> list(map(int, characteristic(start=7, end=31)))
+    >>> list(map(int, characteristic(start=7, end=31)))
     [1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0]
 
     ``strategy``, if given, is an alternate implementation used to generate
@@ -51,51 +100,30 @@ def characteristic(start=0, end=None, strategy=None):
     # See also: http://mathworld.wolfram.com/PrimeConstant.html
     if start is None:
         start = 0
-    q = start  # Later this will be the previously seen prime.
-    for p in primes(start, end, strategy):
+    if strategy is None:
+        if end is not None and end - start <= _MAX_BYTES:
+            # Bounded range: sieve it in one go and serve the flags
+            # from the packed bytearray. The map/__getitem__ pairing
+            # converts bytes to bools without a Python-level loop.
+            flags = characteristic_bytes(start, end)
+            for flag in map((False, True).__getitem__, flags):
+                yield flag
+            return
+        it = pyprimes.primes(start, end)
+    else:
+        it = pyprimes.strategic.primes(strategy, start, end)
+    q = start - 1  # Later this will be the previously seen prime.
+    for p in it:
         # Process the non-primes between q and p. On average, there are
         # about ln(p) non-primes between prime p and the next (or previous)
-        # so using range() is manageable until we have unbelievably huge
-        # primes.
-        for i in range(p-q-1):  # Like range(q+1, p).
-            yield False
+        # so the gap counts are manageable until we have unbelievably huge
+        # primes. itertools.repeat fills the gap from a C-level iterator,
+        # instead of paying to build a fresh False per composite.
+        for flag in itertools.repeat(False, p - q - 1):
+            yield flag
         # Process the prime.
         yield True
         q = p
     if end is not None:
-        for i in range(end-p-1):  # Like range(p+1, end).
-            yield False
-
-
-
-'''
-class TestCheckedInts(unittest.TestCase):
-    def testIsIterator(self):
-        it = pyprimes.checked_ints()
-        self.assertTrue(it is iter(it))
-
-    def testValues(self):
-        n = PRIMES[-1] + 2
-        expected = [(True, i) for i in PRIMES]
-        x = set(range(n)).difference(set(PRIMES))
-        expected.extend((False, i) for i in x)
-        expected.sort(key=lambda obj: obj[1])
-        actual = list(itertools.islice(pyprimes.checked_ints(), None, n))
-        self.assertEqual(actual, expected)
-
-
-class TestCheckedOddInts(unittest.TestCase):
-    def testIsIterator(self):
-        it = pyprimes.checked_ints()
-        self.assertTrue(it is iter(it))
-
-    def testValues(self):
-        n = PRIMES[-1] + 2
-        expected = [(True, i) for i in PRIMES[1:]]
-        x = set(range(1, n, 2)).difference(set(PRIMES))
-        expected.extend((False, i) for i in x)
-        expected.sort(key=lambda obj: obj[1])
-        actual = list(itertools.islice(pyprimes.checked_oddints(), None, n))
-        self.assertEqual(actual, expected)
-'''
-
+        for flag in itertools.repeat(False, end - q - 1):
+            yield flag
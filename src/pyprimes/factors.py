@@ -37,9 +37,44 @@ For more information, see:
 
 """
 
+import random
+
+try:
+    from math import gcd
+except ImportError:
+    # math.gcd is quite recent; fall back on the fractions version.
+    from fractions import gcd
+
+from pyprimes.sieves import erat
+
+
 __all__ = ['factors', 'factorise']
 
 
+# Primes used for the trial-division phase of factorising. Dividing out
+# the small factors first is cheap, and leaves Pollard's rho with only
+# the hard part of the number to split.
+_SMALL_PRIMES = tuple(erat(1000))
+
+
+def _chunk_products(primes, size):
+    """Group primes into tuples of (chunk of primes, product of chunk)."""
+    chunks = []
+    for i in range(0, len(primes), size):
+        chunk = primes[i:i+size]
+        product = 1
+        for p in chunk:
+            product *= p
+        chunks.append((chunk, product))
+    return chunks
+
+# The small primes batched into chunks together with their products.
+# One gcd against the product tells us whether *any* prime in the chunk
+# divides n, so for numbers with no small factors (the common case) we
+# pay one C-level gcd per chunk instead of one division per prime.
+_SMALL_PRIME_CHUNKS = _chunk_products(_SMALL_PRIMES, 32)
+
+
 if __debug__:
     # Set _EXTRA_CHECKS to True to enable potentially expensive assertions
     # in the factors() and factorise() functions. This is only defined or
@@ -94,20 +129,98 @@ def factors(n):
         yield (-1, 1)
         n = -n
     assert n >= 2
-    from pyprimes import primes
-    for p in primes():
-        if p*p > n: break
-        count = 0
-        while n % p == 0:
-            count += 1
-            n //= p
-        if count:
-            yield (p, count)
-    if n != 1:
+    # Divide out the small primes by trial division first.
+    for chunk, product in _SMALL_PRIME_CHUNKS:
+        if chunk[0]**2 > n:
+            break
+        if gcd(n, product) == 1:
+            # No prime in this chunk divides n; skip them all.
+            continue
+        for p in chunk:
+            if p*p > n: break
+            count = 0
+            while n % p == 0:
+                count += 1
+                n //= p
+            if count:
+                yield (p, count)
+    if n == 1:
+        return
+    if n < _SMALL_PRIMES[-1]**2:
+        # n has no factor up to its square root, so it must be prime.
+        remaining = {n: 1}
+    else:
+        # What is left is too big for trial division; split it into
+        # prime factors with Pollard's rho. The factors come out in no
+        # particular order, so collect them all before yielding.
+        remaining = {}
+        _split(n, remaining)
+    for p in sorted(remaining):
         if __debug__:
             # The following test only occurs if assertions are on.
             if _EXTRA_CHECKS:
                 from pyprimes import is_prime
-                assert is_prime(n), ('final factor %d is not prime' % n)
-        yield (n, 1)
+                assert is_prime(p), ('final factor %d is not prime' % p)
+        yield (p, remaining[p])
+
+
+def _split(n, counts):
+    """Accumulate the prime factorisation of n into dict ``counts``,
+    mapping each prime factor to the number of times it divides n.
+
+    n must be odd, positive, and free of small prime factors.
+    """
+    from pyprimes.probabilistic import is_probable_prime
+    if is_probable_prime(n):
+        # For astronomically large n this is probabilistic, with a
+        # vanishingly small chance of accepting a composite undivided.
+        counts[n] = counts.get(n, 0) + 1
+        return
+    d = _pollard_rho(n)
+    assert 1 < d < n
+    _split(d, counts)
+    _split(n//d, counts)
+
+
+def _pollard_rho(n):
+    """Return a non-trivial factor of n using Brent's variant of
+    Pollard's rho algorithm.
+
+    n must be odd, composite and not divisible by very small primes,
+    although the only hard requirements are that n is odd and has a
+    non-trivial factor to find.
+    """
+    # Brent's cycle-finding variant, with the products of |x-y| batched
+    # so that we only pay for one gcd per batch of iterations. See
+    # Brent, "An improved Monte Carlo factorization algorithm" (1980).
+    assert n % 2 == 1
+    batch = 128
+    while True:
+        y = random.randrange(1, n)
+        c = random.randrange(1, n)
+        x = ys = 1  # Will be properly set inside the loops.
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y*y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(batch, r-k)):
+                    y = (y*y + c) % n
+                    q = q*(x-y) % n
+                g = gcd(q, n)
+                k += batch
+            r *= 2
+        if g == n:
+            # The batched product hit zero; back up and retry the last
+            # batch one step at a time.
+            g = 1
+            while g == 1:
+                ys = (ys*ys + c) % n
+                g = gcd(abs(x-ys), n)
+        if g != n:
+            return g
+        # Otherwise the cycle was degenerate; try again with new c.
 
@@ -74,9 +74,19 @@ Other primality tests included are:
 
 from __future__ import division
 
+import bisect
+import itertools
 import random
 
+try:
+    from math import gcd
+except ImportError:
+    # math.gcd is quite recent; fall back on the fractions version.
+    from fractions import gcd
+
 import pyprimes.utilities
+from pyprimes.sieves import erat, _WHEEL210_SPOKES
+from pyprimes.utilities import _bit_length
 
 
 __all__ = ['is_probable_prime', 'is_fermat_probable_prime',
@@ -90,6 +100,18 @@ except NameError:
     _Int = int
 
 
+# The first fifty primes, used for the trial-division pass of
+# is_probable_prime, and their product (primorial). Each extra trial
+# prime rejects roughly 1/p of composites for the price of a share of
+# one gcd, long before the heavyweight Miller-Rabin machinery runs.
+_TRIAL_PRIMES = tuple(erat(230))
+assert len(_TRIAL_PRIMES) == 50
+_TRIAL_PRIMORIAL = 1
+for _p in _TRIAL_PRIMES:
+    _TRIAL_PRIMORIAL *= _p
+del _p
+
+
 # === Instrumented probable prime test ===
 
 class IsProbablePrime(object):
@@ -129,8 +151,8 @@ class IsProbablePrime(object):
     Normally you would use the instance ``is_probable_prime``:
 
 
-    For ``n`` below approximately 3.8 million trillion, the return result
-    will always be 0 or 1 (definitely non-prime, or definitely prime).
+    For ``n`` below approximately 3.3e24, the return result will
+    always be 0 or 1 (definitely non-prime, or definitely prime).
     For larger arguments, the result may be 2, which indicates that the
     argument is only probably a prime number. The probability that a
     composite number is wrongly identified as prime is vanishingly small
@@ -180,8 +202,16 @@ class IsProbablePrime(object):
 
     """
 
-    # Table of small primes.
+    # Table of small primes, used as Miller-Rabin witnesses.
     primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+    # Longer table of small primes used for trial division, with their
+    # primorial; a single gcd against the primorial detects a common
+    # factor with any of them in one C-level bignum operation.
+    _trial_primes = _TRIAL_PRIMES
+    _trial_set = frozenset(_TRIAL_PRIMES)
+    _trial_primorial = _TRIAL_PRIMORIAL
+    # No composite below this limit survives the trial division.
+    _trial_limit = _TRIAL_PRIMES[-1]**2
     # Default number of random Miller-Rabin tests to perform.
     count = 30
 
@@ -197,22 +227,24 @@ class IsProbablePrime(object):
         or unsure (may be prime).
         """
         # For speed, we deal with some simple deterministic cases first,
-        # and use a quick trial division round to eliminate factors of
-        # the smaller primes. This eliminates most small candidate primes
-        # without the expense of the Miller-Rabin tests.
+        # and eliminate factors of the smaller primes. This catches most
+        # small candidate primes without the expense of the Miller-Rabin
+        # tests. Rather than dividing by each small prime in turn, one
+        # gcd against their product detects a shared factor in a single
+        # C-level bignum operation.
         assert n > 1
-        for p in self.primes:
-            if n == p:
+        if gcd(n, self._trial_primorial) != 1:
+            # n shares a factor with one of the trial primes, so it is
+            # either one of them, or composite.
+            if n in self._trial_set:
                 return 1  # Certainly prime.
-            elif n % p == 0:
-                return 0  # Certainly composite.
-        # When doing trial division, we can stop checking for prime factors
-        # at the square root of n. If the last prime factor we checked is
-        # larger than sqrt(n), n must be definitely prime.
-        assert p == self.primes[-1]
-        if p**2 > n:
+            return 0  # Certainly composite.
+        # When doing trial division, we can stop checking for prime
+        # factors at the square root of n. Since n has no factor up to
+        # _trial_primes[-1], anything below its square must be prime.
+        if n < self._trial_limit:
             return 1
-        assert n >= 367  # The smallest number not handled above.
+        assert n >= 229**2  # The smallest number not handled above.
         return 2  # Unsure.
 
     def _determistic_miller_rabin(self, n):
@@ -253,7 +285,7 @@ class IsProbablePrime(object):
         Returns 0, 1 or 2 for definitely non-prime, definitely prime,
         or unsure (maybe prime).
         """
-        # For sufficiently large n, currently greater than ~3.8e18, there
+        # For sufficiently large n, currently greater than ~3.3e24, there
         # is no known minimal set of Miller-Rabin witnesses which will
         # definitively prove primality. We can still get a guaranteed
         # result by exhaustive testing with every witness in the range
@@ -281,8 +313,24 @@ class IsProbablePrime(object):
         assert n > 1
         if count is None:
             count = self.count
-        bases = tuple([random.randint(2, n-1) for _ in range(count)])
-        return is_miller_rabin_probable_prime(n, bases)
+        # Generate the witnesses lazily, one at a time, so that when a
+        # witness proves n composite we stop immediately instead of
+        # having generated all ``count`` random bases up front. On
+        # average a composite is caught within one or two witnesses.
+        nm1 = n - 1
+        d, s = _factor2(nm1)
+        getrandbits = random.getrandbits
+        k = _bit_length(nm1)
+        for _ in range(count):
+            # Draw bases uniformly from 2...n-1 inclusive by rejection;
+            # getrandbits is the primitive randint itself is built on,
+            # minus the per-call range arithmetic.
+            a = getrandbits(k)
+            while not 2 <= a < n:
+                a = getrandbits(k)
+            if _is_composite(a, d, s, n, nm1):
+                return 0  # n is definitely composite.
+        return 2  # Maybe prime.
 
     def _simple(self, n):
         """Handle the simple cases."""
@@ -297,23 +345,38 @@ class IsProbablePrime(object):
                 _prime_miller_rabin,
                 _randomized_miller_rabin,
                 )
+    # The method names, resolved once here rather than via a __name__
+    # descriptor lookup on every _check_primality call.
+    _method_names = tuple(m.__name__ for m in _methods)
 
     def _check_primality(self, n):
         if not isinstance(n, _Int):
             raise TypeError
-        for method in self._methods:
+        for i, method in enumerate(self._methods):
             flag = method(self, n)
             assert flag in (0, 1, 2)
             if flag in (0, 1):
                 # Certainly prime or not prime.
-                return (method.__name__, flag)
+                return (self._method_names[i], flag)
         assert flag == 2  # Unsure.
-        return (method.__name__, flag)
+        return (self._method_names[i], flag)
 
     def is_probable_prime(self, n):
-        """xxx
+        """Return a three-state primality flag (0, 1 or 2) for n,
+        without updating the instrumentation.
+
+        This runs the same decision sequence as calling the instance,
+        but skips the per-call bookkeeping, making it the cheapest
+        entry point for hot loops.
         """
-        return self._check_primality(n)[1]
+        if not isinstance(n, _Int):
+            raise TypeError
+        for method in self._methods:
+            flag = method(self, n)
+            assert flag in (0, 1, 2)
+            if flag != 2:
+                return flag
+        return flag
 
     def __call__(self, n):
         """Instrumented version of the ``is_probable_prime`` method."""
@@ -413,9 +476,11 @@ def is_fermat_probable_prime(n, base=2):
         return 1  # Certainly prime.
     elif n % 2 == 0:
         return 0
-    # Now the Fermat test proper.
+    # Now the Fermat test proper. Compute the exponent once, rather
+    # than re-doing the (potentially bignum) subtraction for each base.
+    exp = n - 1
     for a in base:
-        if pow(a, n-1, n) != 1:
+        if pow(a, exp, n) != 1:
             return 0  # n is certainly composite.
     return 2  # All of the bases are witnesses for n being prime.
 
@@ -497,10 +562,12 @@ def is_miller_rabin_probable_prime(n, base=2):
     elif n % 2 == 0:
         return 0
     # Now perform the Miller-Rabin test proper.
-    # Start by writing n-1 as 2**s * d.
-    d, s = _factor2(n-1)
+    # Start by writing n-1 as 2**s * d. n-1 is computed once and passed
+    # down, saving a bignum subtraction per witness and per squaring.
+    nm1 = n - 1
+    d, s = _factor2(nm1)
     for a in base:
-        if _is_composite(a, d, s, n):
+        if _is_composite(a, d, s, n, nm1):
             return 0  # n is definitely composite.
     # If we get here, all of the bases are witnesses for n being prime.
     return 2  # Maybe prime.
@@ -517,37 +584,40 @@ def _factor2(n):
     Private function used internally by the Miller-Rabin primality test.
     """
     assert n > 0
-    i = 0
-    d = n
-    while 1:
-        q, r = divmod(d, 2)
-        if r == 1:
-            break
-        i += 1
-        d = q
+    # (n & -n) isolates the lowest set bit, so its bit length gives the
+    # number of trailing zero bits directly, without a Python-level loop
+    # dividing by two up to ~60 times for 64-bit inputs.
+    i = _bit_length(n & -n) - 1
+    d = n >> i
     assert d%2 == 1
     assert d*2**i == n
     return (d, i)
 
 
-def _is_composite(b, d, s, n):
-    """_is_composite(b, d, s, n) -> True|False
+def _is_composite(b, d, s, n, nm1):
+    """_is_composite(b, d, s, n, nm1) -> True|False
 
-    Tests base b to see if it is a witness for n being composite. Returns
-    True if n is definitely composite, otherwise False if it *may* be prime.
+    Tests base b to see if it is a witness for n being composite, where
+    ``nm1`` is n-1, precomputed by the caller. Returns True if n is
+    definitely composite, otherwise False if it *may* be prime.
 
-    >>> _is_composite(4, 3, 7, 385)
+    >>> _is_composite(4, 3, 7, 385, 384)
     True
-    >>> _is_composite(221, 3, 7, 385)
+    >>> _is_composite(221, 3, 7, 385, 384)
     False
 
     Private function used internally by the Miller-Rabin primality test.
     """
-    assert d*2**s == n-1
-    if pow(b, d, n) == 1:
+    assert d*2**s == nm1 == n-1
+    # Compute b**d once, then reach each b**(2**i * d) by repeated
+    # squaring, instead of redoing the full modular exponentiation
+    # from scratch for every i.
+    x = pow(b, d, n)
+    if x == 1 or x == nm1:
         return False
-    for i in range(s):
-        if pow(b, 2**i * d, n) == n-1:
+    for _ in range(s-1):
+        x = (x*x) % n
+        if x == nm1:
             return False
     return True
 
@@ -571,6 +641,54 @@ def is_miller_rabin_definite_prime(n):
     return is_miller_rabin_probable_prime(n, witnesses) != 0
 
 
+# Verified sets of Miller-Rabin witnesses which conclusively determine
+# primality for all n below the matching cutoff. Pomerance, Selfridge
+# and Wagstaff (1980), and Jaeschke (1993) found the smaller sets; the
+# final seven-base set for everything below 2**64 was found by Jim
+# Sinclair and confirmed against the Feitsma-Galway database of base-2
+# strong pseudoprimes.
+#
+# References:
+#   [1] http://oeis.org/A014233
+#   [2] http://mathworld.wolfram.com/Rabin-MillerStrongPseudoprimeTest.html
+#   [3] http://primes.utm.edu/prove/prove2_3.html
+#   [4] http://en.wikipedia.org/wiki/Miller%E2%80%93Rabin_primality_test
+#   [5] http://miller-rabin.appspot.com/
+#   [6] http://www.cecm.sfu.ca/Pseudoprimes/
+#   [7] Sorenson and Webster, "Strong pseudoprimes to twelve prime
+#       bases", Math. Comp. 86 (2017); http://arxiv.org/abs/1509.00864
+#
+# _MR_WITNESSES[i] is definitive for all odd n < _MR_CUTOFFS[i].
+_MR_CUTOFFS = (
+    2047,                 # [1], [2], [4]
+    1373653,              # ~1.3 million      [1], [2], [3], [4]
+    9080191,              # ~9.0 million      [3], [4]
+    25326001,             # ~25.3 million     [1], [2], [3], [4]
+    3215031751,           # ~3.2 billion      [1], [2], [3], [4]
+    4759123141,           # ~4.7 billion      [3], [4]
+    2152302898747,        # ~2.1 trillion     [1], [2], [3], [4]
+    3474749660383,        # ~3.4 trillion     [1], [2], [3], [4]
+    341550071728321,      # ~341.5 trillion   [1], [2], [3], [4]
+    3825123056546413051,  # ~3.8 million trillion  [1], [4]
+    2**64 + 1,            # [5], [6]
+    3317044064679887385961981,  # ~3.3e24  [7]
+    )
+_MR_WITNESSES = (
+    (2,),
+    (2, 3),
+    (31, 73),
+    (2, 3, 5),
+    (2, 3, 5, 7),
+    (2, 7, 61),
+    (2, 3, 5, 7, 11),
+    (2, 3, 5, 7, 11, 13),
+    (2, 3, 5, 7, 11, 13, 17),
+    (2, 3, 5, 7, 11, 13, 17, 19, 23),
+    (2, 325, 9375, 28178, 450775, 9780504, 1795265022),
+    (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41),
+    )
+
+
 def _get_miller_rabin_witnesses(n):
     """Return a tuple of definitive Miller-Rabin witnesses for n."""
     # We can always get a guaranteed (determistic, non-probabilistic)
@@ -580,74 +698,26 @@ def _get_miller_rabin_witnesses(n):
     # further reduced to min(n-1, floor(2*(ln n)**2)).
     #
     # However, for sufficiently small n, it is possible to get a
-    # deterministic answer from a mere handful of witnesses.
-    #
-    # Pomerance, Selfridge and Wagstaff (1980), and Jaeschke (1993)
-    # have found small sets of bases which conclusively determine
-    # primality for all values of n up to some upper limit, currently
-    # around 3.8 million trillion (3.8e18).
-    #
-    # References:
-    #   [1] http://oeis.org/A014233
-    #   [2] http://mathworld.wolfram.com/Rabin-MillerStrongPseudoprimeTest.html
-    #   [3] http://primes.utm.edu/prove/prove2_3.html
-    #   [4] http://en.wikipedia.org/wiki/Miller%E2%80%93Rabin_primality_test
-    #
+    # deterministic answer from a mere handful of witnesses; see the
+    # tables of cutoffs and witnesses above. Bisecting the cutoff table
+    # runs in C, instead of up to eleven Python-level comparisons.
     assert (n > 2) and (n%2 == 1)
-    if n < 2047:
-        # References: [1], [2], [4]
-        witnesses = (2,)
-    elif n < 1373653:  # ~1.3 million
-        # References: [1], [2], [3], [4]
-        witnesses = (2, 3)
-    elif n < 9080191:  # ~9.0 million
-        # References: [3], [4]
-        witnesses = (31, 73)
-    elif n < 25326001:  # ~25.3 million
-        # References: [1], [2], [3], [4]
-        witnesses = (2, 3, 5)
-    elif n < 3215031751:  # ~3.2 billion
-        # References: [1], [2], [3], [4]
-        witnesses = (2, 3, 5, 7)
-    elif n < 4759123141:  # ~4.7 billion
-        # References: [3], [4]
-        witnesses = (2, 7, 61)
-    # elif n < 1122004669633:  # ~1.2 trillion
-    ## We don't bother with these witnesses, since the next block
-    ## uses almost as few and has better references.
-    #     bases = (2, 13, 23, 1662803)  # References: [4]
-    elif n < 2152302898747:  # ~2.1 trillion
-        # References: [1], [2], [3], [4]
-        witnesses = (2, 3, 5, 7, 11)
-    elif n < 3474749660383:  # ~3.4 trillion
-        # References: [1], [2], [3], [4]
-        witnesses = (2, 3, 5, 7, 11, 13)
-    elif n < 341550071728321:  # ~341.5 trillion
-        # References: [1], [2], [3], [4]
-        witnesses = (2, 3, 5, 7, 11, 13, 17)
-    elif n < 3825123056546413051:  # ~3.8 million trillion
-        # References: [1], [4]
-        witnesses = (2, 3, 5, 7, 11, 13, 17, 19, 23)
-    elif n <= 2**64:
-        # The first 12 primes make up a set of deterministic witnesses
-        # for all numbers below 2**64.
-        # References: FIXME
-        witnesses = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
-        # This page: http://miller-rabin.appspot.com/
-        # claims that these make up a minimal set:
-        # witnesses = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
-        # but until that result is confirmed I'm sticking to the primes.
-    else:
-        witnesses = None
-    return witnesses
+    i = bisect.bisect_right(_MR_CUTOFFS, n)
+    if i == len(_MR_WITNESSES):
+        return None
+    return _MR_WITNESSES[i]
 
 
 def primes():
     """Generate prime numbers by testing rather than sieving."""
     warned = False
-    yield 2
-    i = 3
-    while True:
+    for i in (2, 3, 5, 7):
+        yield i
+    # Step through the spokes of the modulo-210 wheel, so candidates
+    # divisible by 2, 3, 5 or 7 are never tested at all; that is about
+    # 77% of all integers skipped before is_probable_prime is called.
+    i = 11
+    for step in itertools.cycle(_WHEEL210_SPOKES):
         flag = is_probable_prime(i)
         if flag == 2 and not warned:
             import warnings
@@ -656,6 +726,6 @@ def primes():
             warned = True
         if flag:
             yield i
-        i += 2
+        i += step
 
 
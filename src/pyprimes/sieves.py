@@ -10,8 +10,11 @@
 import itertools
 
 from pyprimes.compat23 import compress, next, range
+from pyprimes.utilities import isqrt
 
-__all__ = ['best_sieve', 'cookbook', 'croft', 'erat', 'sieve', 'wheel']
+__all__ = ['best_sieve', 'cookbook', 'croft', 'croft_batched', 'erat',
+           'erat_parallel', 'erat_segmented', 'primes_from', 'sieve',
+           'wheel']
 
 
 def erat(n):
@@ -26,20 +29,141 @@ def erat(n):
     """
     if n < 2:
         return []
-    # Generate a fixed array of integers.
-    arr = list(range(n+1))  # A list is faster than an array.
-    # Cross out 0 and 1 since they aren't prime.
-    arr[0] = arr[1] = None
-    i = 2
-    while i*i <= n:
-        # Cross out all the multiples of i starting from i**2.
-        for p in range(i*i, n+1, i):
-            arr[p] = None
-        # Advance to the next number not crossed off.
-        i += 1
-        while i <= n and arr[i] is None:
-            i += 1
-    return list(filter(None, arr))
+    # Generate a fixed array of flags, one byte per *odd* candidate:
+    # index i represents the number 2*i + 1, with 2 handled separately
+    # at the end. Storing the odds only halves the sieve's footprint
+    # compared with indexing by value. (Packing the flags eight to a
+    # byte would shrink it further still, but without C-level bit
+    # operations the extra crossing-off cost outweighs the saving.)
+    half = (n-1)//2  # Index of the largest odd number <= n.
+    sieve = bytearray([1]) * (half+1)
+    sieve[0] = 0  # 1 is not prime.
+    for i in range(1, (isqrt(n) - 1)//2 + 1):
+        if sieve[i]:
+            p = 2*i + 1
+            # Cross out the odd multiples of p starting from p**2.
+            # Doing so with a single slice assignment moves the
+            # inner loop out of pure Python and into C.
+            start = (p*p - 1)//2
+            sieve[start::p] = bytearray(len(range(start, half+1, p)))
+    return [2] + [2*i+1 for i in range(1, half+1) if sieve[i]]
+
+
+def erat_segmented(n, segment_size=32*1024):
+    """Return a list of primes up to and including n, sieving by segments.
+
+    This returns the same result as ``erat``, but does the work in
+    fixed-size segments, re-using the primes up to sqrt(n) to cross off
+    the composites in each segment in turn:
+
+    >>> erat_segmented(30)
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+
+    Because the working array never grows beyond ``segment_size`` entries,
+    it stays resident in the CPU cache no matter how large n is, which
+    makes a big difference once n greatly exceeds the cache size. Peak
+    memory use is O(sqrt(n)) plus the result itself, rather than O(n).
+    """
+    if n < 2:
+        return []
+    root = isqrt(n)
+    # The primes up to sqrt(n) are all we need for crossing off, and
+    # they are also the start of the result.
+    base_primes = erat(root)
+    result = list(base_primes)
+    lo = root + 1
+    while lo <= n:
+        hi = min(lo + segment_size, n + 1)  # Segment covers range(lo, hi).
+        result.extend(_sieve_segment((lo, hi, base_primes)))
+        lo = hi
+    return result
+
+
+def _sieve_segment(args):
+    """Return a list of the primes in range(lo, hi), given the primes
+    up to sqrt(hi) to cross off with.
+
+    ``args`` is a single tuple (lo, hi, base_primes), so the function
+    can be mapped over a list of segments (including by a process pool,
+    which is why it must be a module-level function).
+    """
+    lo, hi, base_primes = args
+    sieve = bytearray([1]) * (hi - lo)
+    for p in base_primes:
+        # Find the first multiple of p inside the segment. Anything
+        # below p**2 has already been crossed off by a smaller prime.
+        start = max(p*p, (lo + p - 1)//p * p)
+        sieve[start-lo::p] = bytearray(len(range(start-lo, hi-lo, p)))
+    return [i for i in range(lo, hi) if sieve[i-lo]]
+
+
+def erat_parallel(n, segment_size=1024*1024, workers=None):
+    """Return a list of primes up to and including n, sieving segments
+    across multiple processes.
+
+    This returns the same result as ``erat`` and ``erat_segmented``:
+
+    >>> erat_parallel(30)
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+
+    Once the primes up to sqrt(n) are known, each segment of the sieve
+    is independent of the others, so the segments are farmed out to a
+    pool of worker processes, ``workers`` defaulting to the number of
+    CPUs. The per-segment results still have to be pickled back to the
+    parent, so this only pays off when n is large enough (roughly 10**8
+    and up) for the sieving to dominate that overhead.
+
+    Requires the ``concurrent.futures`` module; on Python versions
+    without it, this silently falls back to the serial segmented sieve.
+    """
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+    except ImportError:
+        return erat_segmented(n, segment_size)
+    if n < 2:
+        return []
+    root = isqrt(n)
+    base_primes = erat(root)
+    result = list(base_primes)
+    segments = [(lo, min(lo + segment_size, n + 1), base_primes)
+                for lo in range(root + 1, n + 1, segment_size)]
+    with ProcessPoolExecutor(workers) as executor:
+        for segment_primes in executor.map(_sieve_segment, segments):
+            result.extend(segment_primes)
+    return result
+
+
+def primes_from(start, segment_size=32*1024):
+    """Yield the primes greater than or equal to ``start``, in
+    ascending order, without end.
+
+    >>> it = primes_from(10**9)
+    >>> [next(it) for _ in range(3)]
+    [1000000007, 1000000009, 1000000021]
+
+    The generators in this module all start from 2, so reaching the
+    primes near some large ``start`` means winding one of them through
+    every smaller prime first. This instead sieves fixed-size segments
+    beginning directly at ``start``, needing only the primes up to the
+    square root of the current segment to cross off with; those are
+    re-sieved (cheaply, they grow with the square root) as the segments
+    climb past them.
+    """
+    lo = max(start, 2)
+    if lo == 2:
+        yield 2
+        lo = 3
+    root = 0
+    base_primes = []
+    while True:
+        hi = lo + segment_size
+        r = isqrt(hi - 1)
+        if r > root:
+            base_primes = erat(r)
+            root = r
+        for p in _sieve_segment((lo, hi, base_primes)):
+            yield p
+        lo = hi
 
 
 def sieve():
@@ -84,13 +208,16 @@ def cookbook():
     # http://onlamp.com/pub/a/python/excerpt/pythonckbk_chap1/index1.html?page=2
     table = {}
     yield 2
+    pop = table.pop  # Bind the method lookup once, outside the loop.
     # Iterate over [3, 5, 7, 9, ...]. The following is equivalent to, but
     # faster than, (2*i+1 for i in itertools.count(1))
     for q in itertools.islice(itertools.count(3), 0, None, 2):
-        # Note: this explicit test is marginally faster than using
-        # table.pop(i, None) and testing for None.
-        if q in table:
-            p = table[q]; del table[q]  # Faster than pop.
+        # Note: on older CPythons an explicit membership test followed
+        # by separate fetch and del was marginally faster, but a single
+        # pop with a sentinel does one hash probe instead of three and
+        # now measures a few percent faster.
+        p = pop(q, None)
+        if p is not None:
             x = p + q
             while x in table or not (x & 1):
                 x += p
@@ -100,6 +227,19 @@ def cookbook():
             yield q
 
 
+# Lookup table of the residues modulo 30 that a prime greater than 5
+# can take: entry r is 1 if gcd(r, 30) == 1, and 0 otherwise. Indexing
+# a bytearray is a single C-level fetch, cheaper than hashing into a
+# set, and hoisting the table to module level means it is built once
+# rather than on every call to croft().
+_PRIMEROOTS30 = bytearray(
+    1 if r in (1, 7, 11, 13, 17, 19, 23, 29) else 0 for r in range(30))
+
+# Selector mask for the odd numbers 7, 9, 11, ... 35, marking those
+# coprime to 3 and 5 (the mask repeats with period 15).
+_CROFT_SELECTORS = (1, 0, 1, 1, 0, 1, 1, 0, 1, 0, 0, 1, 1, 0, 0)
+
+
 def croft():
     """Yield prime integers using the Croft Spiral sieve.
 
@@ -114,21 +254,22 @@ def croft():
     for p in (2, 3, 5):
         yield p
     roots = {9: 3, 25: 5}  # Map d**2 -> d.
-    primeroots = frozenset((1, 7, 11, 13, 17, 19, 23, 29))
-    selectors = (1, 0, 1, 1, 0, 1, 1, 0, 1, 0, 0, 1, 1, 0, 0)
+    pop = roots.pop  # Bind the method lookup once, outside the loop.
+    primeroots = _PRIMEROOTS30
     for q in compress(
             # Iterate over prime candidates 7, 9, 11, 13, ...
             itertools.islice(itertools.count(7), 0, None, 2),
             # Mask out those that can't possibly be prime.
-            itertools.cycle(selectors)
+            itertools.cycle(_CROFT_SELECTORS)
             ):
-        # Using dict membership testing instead of pop gives a
-        # 5-10% speedup over the first three million primes.
-        if q in roots:
-            p = roots[q]
-            del roots[q]
+        # On older CPythons, dict membership testing plus separate
+        # fetch and del beat pop by 5-10%; on current versions a bound
+        # pop with a sentinel does one hash probe instead of three and
+        # measures a few percent faster.
+        p = pop(q, None)
+        if p is not None:
             x = q + 2*p
-            while x in roots or (x % 30) not in primeroots:
+            while x in roots or not primeroots[x % 30]:
                 x += 2*p
             roots[x] = p
         else:
@@ -136,19 +277,47 @@ def croft():
             yield q
 
 
+# Gaps between consecutive candidates on the modulo-210 wheel. The
+# constants are taken from the paper by O'Neill.
+_WHEEL210_SPOKES = (2, 4, 2, 4, 6, 2, 6, 4, 2, 4, 6, 6, 2, 6, 4, 2, 6, 4, 6,
+    8, 4, 2, 4, 2, 4, 8, 6, 4, 6, 2, 4, 6, 2, 6, 6, 4, 2, 4, 6, 2,
+    6, 4, 2, 4, 2, 10, 2, 10)
+assert len(_WHEEL210_SPOKES) == 48
+
+
+def croft_batched(size=4096):
+    """Yield lists of consecutive primes, each of length ``size``.
+
+    >>> it = croft_batched(4)
+    >>> next(it)
+    [2, 3, 5, 7]
+    >>> next(it)
+    [11, 13, 17, 19]
+
+    This wraps ``croft``, batching its output so that bulk consumers
+    pay one generator resume per ``size`` primes rather than one per
+    prime; iterating over each yielded list then runs at C speed.
+    The batches are freshly-allocated lists, so callers may keep or
+    mutate them.
+    """
+    buf = []
+    append = buf.append  # Avoid the method lookup in the loop.
+    for p in croft():
+        append(p)
+        if len(buf) == size:
+            yield buf
+            buf = []
+            append = buf.append
+
+
 def wheel():
     """Generate prime numbers using wheel factorisation modulo 210."""
     for i in (2, 3, 5, 7, 11):
         yield i
-    # The following constants are taken from the paper by O'Neill.
-    spokes = (2, 4, 2, 4, 6, 2, 6, 4, 2, 4, 6, 6, 2, 6, 4, 2, 6, 4, 6,
-        8, 4, 2, 4, 2, 4, 8, 6, 4, 6, 2, 4, 6, 2, 6, 6, 4, 2, 4, 6, 2,
-        6, 4, 2, 4, 2, 10, 2, 10)
-    assert len(spokes) == 48
-    # This removes about 77% of the composites that we would otherwise
-    # need to divide by.
+    # Skipping the wheel's composite spokes removes about 77% of the
+    # composites that we would otherwise need to divide by.
     found = [(11, 121)]  # Smallest prime we care about, and its square.
-    for incr in itertools.cycle(spokes):
+    for incr in itertools.cycle(_WHEEL210_SPOKES):
         i += incr
         for p, p2 in found:
             if p2 > i:  # i must be a prime.
@@ -16,6 +16,7 @@ Timing the speed of primes algorithms
 
 from __future__ import division
 
+import signal
 import sys
 from itertools import islice
 
@@ -36,19 +37,38 @@ import pyprimes.sieves as sieves
 
 YEAR100 = 100*365*24*60*60  # One hundred years, in seconds.
 
+try:
+    # The integer nanosecond counter has no float rounding in the
+    # subtraction, and is the cheapest clock to read, which matters
+    # when timing very short trials.
+    from time import perf_counter_ns as _default_timer
+    _DEFAULT_SCALE = 1e-9
+except ImportError:
+    # No time.perf_counter_ns before Python 3.7.
+    from timeit import default_timer as _default_timer
+    _DEFAULT_SCALE = 1.0
+
+
 class Stopwatch(object):
+    """Simple stopwatch, reporting elapsed time in seconds."""
+
+    __slots__ = ('timer', '_scale', '_start', '_elapsed')
+
     def __init__(self, timer=None):
         if timer is None:
-            from timeit import default_timer as timer
+            timer = _default_timer
+            self._scale = _DEFAULT_SCALE
+        else:
+            # Caller-supplied timers are assumed to report seconds.
+            self._scale = 1.0
+        # Stored on the instance, self.timer is a plain function, not
+        # a bound method, so calling it skips the method machinery.
         self.timer = timer
         self.reset()
 
     def reset(self):
         """Reset all the collected timer results."""
-        try:
-            del self._start
-        except AttributeError:
-            pass
+        self._start = None
         self._elapsed = 0.0
 
     def start(self):
@@ -57,30 +77,58 @@ class Stopwatch(object):
 
     def stop(self):
         """Stop the timer."""
-        t = self.timer()
-        self._elapsed = t - self._start
-        del self._start
+        self._elapsed = (self.timer() - self._start)*self._scale
+        self._start = None
 
     @property
     def elapsed(self):
         return self._elapsed
 
 
-def trial(generator, count, repeat=1):
+class TrialTimeout(Exception):
+    """Raised inside trial() when a single timed run takes too long."""
+    pass
+
+
+def _alarm_handler(signum, frame):
+    raise TrialTimeout
+
+
+def trial(generator, count, repeat=1, timeout=None):
+    """Return the best elapsed time, in seconds, that ``generator``
+    takes to produce its ``count``-th prime, over ``repeat`` runs.
+
+    If ``timeout`` is given, any single run longer than that many
+    seconds is aborted by ``signal.alarm`` and the result is
+    ``float('inf')``, so the very slow generators cannot hang the whole
+    benchmark suite. SIGALRM only exists on Unix; elsewhere the timeout
+    is silently ignored.
+    """
+    use_alarm = timeout is not None and hasattr(signal, 'SIGALRM')
     timer = Stopwatch()
     best = YEAR100
     for i in range(repeat):
         it = generator()
         timer.reset()
-        timer.start()
-        # Go to the count-th prime as fast as possible.
-        p = next(islice(it, count-1, count))
-        timer.stop()
+        if use_alarm:
+            old_handler = signal.signal(signal.SIGALRM, _alarm_handler)
+            signal.alarm(max(1, int(timeout)))
+        try:
+            timer.start()
+            # Go to the count-th prime as fast as possible.
+            p = next(islice(it, count-1, count))
+            timer.stop()
+        except TrialTimeout:
+            return float('inf')
+        finally:
+            if use_alarm:
+                signal.alarm(0)
+                signal.signal(signal.SIGALRM, old_handler)
         best = min(best, timer.elapsed)
     return best
 
 
-def run(generators, number, repeat=1):
+def run(generators, number, repeat=1, timeout=None):
     print ("Calculating speeds for first %d primes..." % number)
     template = "\r  ...%d of %d %s"
     heading = """\
@@ -95,7 +143,7 @@ Generator                             Elapsed    Speed
         name = generator.__module__ + '.' + generator.__name__
         sys.stdout.write((template % (i+1, N, name)).ljust(69))
         sys.stdout.flush()
-        t = trial(generator, number, repeat)
+        t = trial(generator, number, repeat, timeout)
         records.append((number/t, t, name))
     timer.stop()
     sys.stdout.write("\r%-69s\n" % "Done!")
@@ -114,105 +162,35 @@ FAST = [sieves.cookbook, sieves.croft, sieves.sieve, sieves.wheel]
 MOST = SLOW + FAST
 ALL = VERY_SLOW + MOST
 
-run(VERY_SLOW + SLOW, 1000)
-run([awful.primes3, awful.trial_division], 5000)
-#run([awful.primes3, awful.trial_division], 50000)
-#run([awful.primes3, awful.trial_division], 100000)
-#run([awful.primes3, awful.trial_division], 200000)
-exit()
-
-
-run(ALL, 500, 3)
-run(MOST, 10000)
-run(FAST, 1000000)
-
-
-
-
-"""
-Python 2.6 or better
-
-import multiprocessing
-import time
+SUITES = {
+    'very-slow': VERY_SLOW,
+    'slow': SLOW,
+    'fast': FAST,
+    'most': MOST,
+    'all': ALL,
+    }
+
+
+def main(argv=None):
+    """Run the benchmark suite named on the command line."""
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Time the speed of the pyprimes generators.")
+    parser.add_argument('suite', nargs='?', default='most',
+        choices=sorted(SUITES),
+        help="which set of generators to time (default: %(default)s)")
+    parser.add_argument('-n', '--number', type=int, default=1000, metavar='N',
+        help="time how long it takes to reach the Nth prime "
+             "(default: %(default)s)")
+    parser.add_argument('-r', '--repeat', type=int, default=1, metavar='R',
+        help="repeat each trial R times and keep the best "
+             "(default: %(default)s)")
+    parser.add_argument('-t', '--timeout', type=float, default=None,
+        metavar='SECONDS',
+        help="abort any single trial taking longer than this (Unix only)")
+    args = parser.parse_args(argv)
+    run(SUITES[args.suite], args.number, args.repeat, args.timeout)
 
-# bar
-def bar():
-    for i in range(100):
-        print "Tick"
-        time.sleep(1)
 
 if __name__ == '__main__':
-    # Start bar as a process
-    p = multiprocessing.Process(target=bar)
-    p.start()
-
-    # Wait for 10 seconds or until process finishes
-    p.join(10)
-
-    # If thread is still active
-    if p.is_alive():
-        print "running... let's kill it..."
-
-        # Terminate
-        p.terminate()
-        p.join()
-
-"""
-
-
-
-"""
-
-Unix only, Python 2.5 or better.
-
-
-In [1]: import signal
-
-# Register an handler for the timeout
-In [2]: def handler(signum, frame):
-   ...:     print "Forever is over!"
-   ...:     raise Exception("end of time")
-   ...:
-
-# This function *may* run for an indetermined time...
-In [3]: def loop_forever():
-   ...:     import time
-   ...:     while 1:
-   ...:         print "sec"
-   ...:         time.sleep(1)
-   ...:
-   ...:
-
-# Register the signal function handler
-In [4]: signal.signal(signal.SIGALRM, handler)
-Out[4]: 0
-
-# Define a timeout for your function
-In [5]: signal.alarm(10)
-Out[5]: 0
-
-In [6]: try:
-   ...:     loop_forever()
-   ...: except Exception, exc:
-   ...:     print exc
-   ....:
-sec
-sec
-sec
-sec
-sec
-sec
-sec
-sec
-Forever is over!
-end of time
-
-# Cancel the timer if the function returned before timeout
-# (ok, mine won't but yours maybe will :)
-In [7]: signal.alarm(0)
-Out[7]: 0
-
-"""
-
-
-
+    sys.exit(main())
@@ -44,6 +44,7 @@ usually named either ``strategy`` or ``prover``.
 from __future__ import division
 
 from pyprimes.compat23 import next
+from pyprimes.utilities import filter_between, isqrt
 
 
 __all__ = ['is_prime', 'next_prime', 'prev_prime', 'primes',
@@ -101,9 +102,11 @@ def trial_division(strategy, n):
         return False
     if n == 2:
         return True
-    if n % 2 == 0:
+    if not (n & 1):
+        # For huge n, the bitwise parity test inspects only the lowest
+        # digit, where % 2 performs a full division.
         return False
-    limit = n**0.5  # FIXME: should use exact isqrt
+    limit = isqrt(n)
     for divisor in strategy():
         if divisor > limit: break
         if n % divisor == 0: return False
@@ -129,23 +132,59 @@ def primes(strategy, start=None, end=None):
     [7, 11, 13, 17, 19, 23, 29]
 
     """
-    #return filter_between(gen(), start, end)
-    it = strategy()
-    p = next(it)
-    if start is not None:
-        # Drop the primes below start as fast as possible, then yield.
-        while p < start:
-            p = next(it)
-    assert start is None or p >= start
-    if end is not None:
-        while p < end:
-            yield p
-            p = next(it)
-    else:
-        while True:
-            yield p
-            p = next(it)
-    # Then yield until end.
+    # filter_between drives the dropping and halting with C-level
+    # dropwhile/takewhile iterators, instead of a Python-level loop
+    # paying a compare and a yield per prime.
+    return filter_between(strategy(), start, end)
+
+
+# Residues modulo 30 which are coprime to 30; numbers in any other
+# residue class are divisible by 2, 3 or 5 and cannot be prime (except
+# for 2, 3 and 5 themselves). Stepping between these residues lets the
+# prime searches below skip almost three quarters of the candidates
+# without calling the prover at all.
+_COPRIME30 = frozenset((1, 7, 11, 13, 17, 19, 23, 29))
+# For each residue r modulo 30, the distance to the next (respectively
+# previous) number whose residue is coprime to 30.
+_NEXT30 = tuple(next(k for k in range(1, 31) if (r+k) % 30 in _COPRIME30)
+                for r in range(30))
+_PREV30 = tuple(next(k for k in range(1, 31) if (r-k) % 30 in _COPRIME30)
+                for r in range(30))
+
+
+# Above this threshold, next_prime and prev_prime sieve a whole window
+# of candidates against small primes before involving the prover; below
+# it, the window setup costs more than the prover calls it saves.
+_WINDOW_THRESHOLD = 10**9
+
+# Small primes used to sieve candidate windows, resolved lazily to
+# avoid a circular import with the sieves module.
+_SIEVE_PRIMES = None
+
+
+def _survivors(lo, hi, reverse=False):
+    """Yield the candidates in the half-open range lo...hi which have no
+    factor among the small sieve primes, in ascending order, or in
+    descending order if ``reverse`` is true.
+
+    Private function used by next_prime and prev_prime. lo must be
+    larger than the square of the largest sieve prime.
+    """
+    global _SIEVE_PRIMES
+    if _SIEVE_PRIMES is None:
+        from pyprimes.sieves import erat
+        _SIEVE_PRIMES = tuple(erat(4096))
+    width = hi - lo
+    window = bytearray([1])*width
+    for p in _SIEVE_PRIMES:
+        # Cross off the multiples of p inside the window. Since lo is
+        # beyond p*p, every multiple crossed off is a genuine composite.
+        start = -lo % p
+        window[start::p] = bytearray(len(range(start, width, p)))
+    indices = range(width-1, -1, -1) if reverse else range(width)
+    for i in indices:
+        if window[i]:
+            yield lo + i
 
 
 def next_prime(prover, n):
@@ -161,12 +200,27 @@ def next_prime(prover, n):
     """
     if n < 2:
         return 2
-    # Advance to the next odd number.
-    if n % 2 == 0:  n += 1
-    else:  n += 2
-    assert n%2 == 1
+    if n < 7:
+        # The wheel only covers candidates above 7, so handle the
+        # smallest primes directly.
+        return {2: 3, 3: 5, 4: 5, 5: 7, 6: 7}[n]
+    if n >= _WINDOW_THRESHOLD:
+        # For large n, sieve windows of candidates against the small
+        # primes and only hand the survivors to the prover. The window
+        # is a few times the average prime gap, so the first window
+        # almost always contains the answer.
+        import math
+        width = int(10*math.log(n))
+        lo = n + 1
+        while True:
+            for candidate in _survivors(lo, lo + width):
+                if is_prime(prover, candidate):
+                    return candidate
+            lo += width
+    # Advance along the mod-30 wheel, skipping multiples of 2, 3 and 5.
+    n += _NEXT30[n % 30]
     while not is_prime(prover, n):
-        n += 2
+        n += _NEXT30[n % 30]
     return n
 
 
@@ -184,11 +238,23 @@ def prev_prime(prover, n):
     """
     if n <= 2:
         raise ValueError('There are no smaller primes than 2.')
-    # Retreat to the previous odd number.
-    if n % 2 == 1:  n -= 2
-    else:  n -= 1
-    assert n%2 == 1
+    if n <= 11:
+        return {3: 2, 4: 3, 5: 3, 6: 5, 7: 5, 8: 7, 9: 7, 10: 7, 11: 7}[n]
+    if n >= _WINDOW_THRESHOLD:
+        # As for next_prime, but scanning sieved windows downwards.
+        import math
+        width = int(10*math.log(n))
+        hi = n
+        while True:
+            for candidate in _survivors(hi - width, hi, reverse=True):
+                if is_prime(prover, candidate):
+                    return candidate
+            hi -= width
+    # Retreat along the mod-30 wheel, skipping multiples of 2, 3 and 5.
+    # This cannot run off the bottom: descending candidates always
+    # strike the primes 11 and 7 before anything smaller.
+    n -= _PREV30[n % 30]
     while not is_prime(prover, n):
-        n -= 2
+        n -= _PREV30[n % 30]
     return n
 
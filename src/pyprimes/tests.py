@@ -14,6 +14,7 @@ to change without notice.
 
 from __future__ import division
 
+import bisect
 import doctest
 import inspect
 import itertools
@@ -34,6 +35,7 @@ if __name__ == '__main__':
 # Modules being tested:
 import pyprimes
 import pyprimes.awful as awful
+import pyprimes.charfunc as charfunc
 import pyprimes.compat23 as compat23
 import pyprimes.factors as factors
 import pyprimes.probabilistic as probabilistic
@@ -60,6 +62,15 @@ PRIMES = [2,   3,   5,   7,   11,  13,  17,  19,  23,  29,
           ]
 assert len(PRIMES) == 100
 
+# The same primes as a frozenset, for membership testing without
+# rebuilding a set per call. PRIMES itself stays a list, since the
+# tests compare it against lists of generator output.
+PRIMES_SET = frozenset(PRIMES)
+
+# Every non-prime from -100 up to the largest known prime, computed
+# once here rather than per call in the composites checks.
+COMPOSITES = sorted(set(range(-100, PRIMES[-1]+1)) - PRIMES_SET)
+
 
 # Skipping tests is only supported in Python 2.7 and up. For older versions,
 # we define a quick and dirty decorator which more-or-less does the same.
@@ -103,19 +114,31 @@ def product(values):
 
 # === Tests ====
 
+# Doctest suites built on the first call to load_tests and reused
+# thereafter, so repeated loads (e.g. by a test runner re-collecting)
+# don't re-parse every docstring in the package.
+_doctest_suites = None
+
 # This is a magic function which automatically loads doctests and
 # creates unit tests from them. It only works in Python 2.7 or better,
 # older versions will ignore it.
 def load_tests(loader, tests, ignore):
-    tests.addTests(doctest.DocTestSuite())
-    tests.addTests(doctest.DocTestSuite(pyprimes))
-    tests.addTests(doctest.DocTestSuite(awful))
-    tests.addTests(doctest.DocTestSuite(compat23))
-    tests.addTests(doctest.DocTestSuite(factors))
-    tests.addTests(doctest.DocTestSuite(probabilistic))
-    tests.addTests(doctest.DocTestSuite(sieves))
-    tests.addTests(doctest.DocTestSuite(strategic))
-    tests.addTests(doctest.DocTestSuite(utilities))
+    global _doctest_suites
+    if _doctest_suites is None:
+        _doctest_suites = [
+            doctest.DocTestSuite(),
+            doctest.DocTestSuite(pyprimes),
+            doctest.DocTestSuite(awful),
+            doctest.DocTestSuite(charfunc),
+            doctest.DocTestSuite(compat23),
+            doctest.DocTestSuite(factors),
+            doctest.DocTestSuite(probabilistic),
+            doctest.DocTestSuite(sieves),
+            doctest.DocTestSuite(strategic),
+            doctest.DocTestSuite(utilities),
+            ]
+    for suite in _doctest_suites:
+        tests.addTests(suite)
     return tests
 
 
@@ -138,14 +161,14 @@ class PrimesMixin:
 
     def check_composites_are_not_prime(self, prime_checker):
         """Check that composites are not detected as prime."""
-        composites = set(range(-100, max(PRIMES)+1)) - set(PRIMES)
-        for n in composites:
+        for n in COMPOSITES:
             self.assertFalse(prime_checker(n))
 
     def check_against_known_prime_list(self, prime_maker):
         """Check that generator produces the first 100 primes."""
-        it = prime_maker()
-        primes = [next(it) for _ in range(100)]
+        # islice drives the generator from C, rather than dispatching
+        # a next() call through the interpreter per prime.
+        primes = list(itertools.islice(prime_maker(), 100))
         self.assertEqual(primes, PRIMES)
 
     def check_is_generator(self, func):
@@ -306,6 +329,11 @@ class Awful_Test(unittest.TestCase, PrimesMixin):
         self.check_is_generator(f)
         self.check_against_known_prime_list(f)
 
+    def test_turner_flat(self):
+        f = awful.turner_flat
+        self.check_is_generator(f)
+        self.check_against_known_prime_list(f)
+
     def test_primes4(self):
         f = awful.primes4
         self.check_is_generator(f)
@@ -317,10 +345,9 @@ class Sieves_Test(unittest.TestCase, PrimesMixin):
 
     def primes_below(self, n):
         """Return prime numbers from PRIMES global up to and including n."""
-        for i,p in enumerate(PRIMES):
-            if p > n:
-                return PRIMES[:i]
-        return PRIMES
+        # A binary search; this is called a few hundred times per test
+        # by the erat tests, so don't scan the whole list each time.
+        return PRIMES[:bisect.bisect_right(PRIMES, n)]
 
     def test_erat_returns_list(self):
         self.assertTrue(isinstance(sieves.erat(10), list))
@@ -334,6 +361,39 @@ class Sieves_Test(unittest.TestCase, PrimesMixin):
         for i in (1, 0, -1, -17):
             self.assertEqual(sieves.erat(i), [])
 
+    def test_erat_segmented(self):
+        for i in range(2, 544):
+            self.assertEqual(sieves.erat_segmented(i), self.primes_below(i))
+        # Use a tiny segment size to exercise the segment loop.
+        self.assertEqual(sieves.erat_segmented(543, segment_size=64),
+                         self.primes_below(543))
+
+    def test_erat_segmented_empty(self):
+        # Check that erat_segmented() returns an empty list below 2.
+        for i in (1, 0, -1, -17):
+            self.assertEqual(sieves.erat_segmented(i), [])
+
+    def test_erat_parallel(self):
+        # Keep this cheap: process pools are expensive to spin up, so
+        # only a couple of calls, with a tiny segment size to exercise
+        # the multi-segment path.
+        self.assertEqual(sieves.erat_parallel(543, segment_size=64),
+                         self.primes_below(543))
+        for i in (1, 0, -1, -17):
+            self.assertEqual(sieves.erat_parallel(i), [])
+
+    def test_primes_from(self):
+        # From the very bottom, primes_from agrees with the known list.
+        it = sieves.primes_from(0)
+        self.assertEqual([next(it) for _ in range(len(PRIMES))], PRIMES)
+        # Starting mid-list, with a tiny segment size to exercise the
+        # segment loop; start is inclusive.
+        it = sieves.primes_from(97, segment_size=64)
+        self.assertEqual([next(it) for _ in range(5)], [97, 101, 103, 107, 109])
+        # Starting from a composite.
+        it = sieves.primes_from(90)
+        self.assertEqual(next(it), 97)
+
     def test_best_sieve(self):
         f = sieves.best_sieve
         self.check_is_generator(f)
@@ -349,6 +409,14 @@ class Sieves_Test(unittest.TestCase, PrimesMixin):
         self.check_is_generator(f)
         self.check_against_known_prime_list(f)
 
+    def test_croft_batched(self):
+        f = sieves.croft_batched
+        self.check_is_generator(f)
+        it = sieves.croft_batched(25)
+        batches = [next(it) for _ in range(4)]
+        self.assertEqual([len(b) for b in batches], [25]*4)
+        self.assertEqual([p for b in batches for p in b], PRIMES)
+
     def test_sieve(self):
         f = sieves.sieve
         self.check_is_generator(f)
@@ -589,6 +657,13 @@ class Factors_Test(unittest.TestCase):
         actual = list(factors.factors(n))
         self.assertEqual(actual, expected)
 
+    def test_factors_large_semiprime(self):
+        # A semiprime with no small factors exercises the Pollard rho
+        # path; trial division alone would take hopelessly long.
+        p, q = 104395303, 122949823
+        self.assertEqual(factors.factorise(p*q), [p, q])
+        self.assertEqual(factors.factorise(p*p), [p, p])
+
     def test_factors_extra(self):
         # Test factorise with _EXTRA_CHECKS enabled.
         if __debug__:
@@ -674,10 +749,14 @@ class PyPrimesTest(unittest.TestCase, PrimesMixin):
     def test_next_prime(self):
         self.assertEqual(pyprimes.next_prime(122949823), 122949829)
         self.assertEqual(pyprimes.next_prime(961748927), 961748941)
+        # Large enough to take the sieved-window path.
+        self.assertEqual(pyprimes.next_prime(10**10), 10000000019)
 
     def test_prev_prime(self):
         self.assertEqual(pyprimes.prev_prime(122949829), 122949823)
         self.assertEqual(pyprimes.prev_prime(961748941), 961748927)
+        # Large enough to take the sieved-window path.
+        self.assertEqual(pyprimes.prev_prime(10**10), 9999999967)
         # self.assertEqual(pyprimes.prev_prime(3), 2)
         self.assertRaises(ValueError, pyprimes.prev_prime, 2)
 
@@ -713,6 +792,13 @@ class PyPrimesTest(unittest.TestCase, PrimesMixin):
         for i, count in enumerate(expected):
             self.assertEqual(pyprimes.prime_count(10**i), count)
 
+    def test_legendre_count(self):
+        # The private Legendre counter used by prime_count for very
+        # large arguments should agree with the sieve-backed counts.
+        expected = [0, 4, 25, 168, 1229, 9592, 78498]
+        for i, count in enumerate(expected):
+            self.assertEqual(pyprimes._legendre_count(10**i), count)
+
     def test_prime_partial_sums(self):
         it = pyprimes.prime_partial_sums()
         self.assertTrue(it is iter(it))
@@ -734,6 +820,13 @@ class PyPrimesTest(unittest.TestCase, PrimesMixin):
             actual = pyprimes.prime_sum(i)
             self.assertEqual(actual, expected)
 
+    def test_prime_stats(self):
+        # prime_stats must agree with prime_count and a direct sum.
+        for n in (0, 1, 2, 10, 97, 543, 10**4):
+            count, total = pyprimes.prime_stats(n)
+            self.assertEqual(count, pyprimes.prime_count(n))
+            self.assertEqual(total, sum(pyprimes.primes(end=n+1)))
+
 
 class StrategicTest:  ###### FIXME     (unittest.TestCase, PrimesMixin):
     """Test suite for the strategic module."""
@@ -873,10 +966,11 @@ class UtilitiesTests(unittest.TestCase):
 class RegressionTests(unittest.TestCase):
     """Regression tests for fixed bugs."""
 
-    @skip("FIXME -- this hangs")
     def test_prev_prime_from_3(self):
         # Regression test for the case of prev_prime(3) --> 2.
-        for prover in ():
+        # This used to hang, stepping down through the odd numbers
+        # below 2 forever.
+        for prover in (awful.isprime, probabilistic.is_probable_prime):
             self.assertEqual(strategic.prev_prime(prover, 3), 2)
         self.assertEqual(pyprimes.prev_prime(3), 2)
 
@@ -100,6 +100,13 @@ except AttributeError:
         return numbits
 
 
+try:
+    from math import isqrt as _math_isqrt
+except ImportError:
+    # No math.isqrt before Python 3.8.
+    _math_isqrt = None
+
+
 def isqrt(n):
     """Return the integer square root of n.
 
@@ -114,6 +121,9 @@ def isqrt(n):
     """
     if n < 0:
         raise ValueError('square root not defined for negative numbers')
+    elif _math_isqrt is not None:
+        # One C call, exact for integers of any size.
+        return _math_isqrt(n)
     elif n <= MAX_EXACT:
         # For speed, we use floating point maths.
         return int(n**0.5)